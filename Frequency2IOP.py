@@ -1,41 +1,186 @@
+import os
+import sys
+from array import array
+from datetime import date, datetime
+
 import pandas as pd
 import numpy as np
+from openpyxl import load_workbook
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # python-calamine is optional; openpyxl is used instead
+    CalamineWorkbook = None
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional; the pure NumPy path is used instead
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 # -----------------------------
 # I/O: read the first two columns from Excel
 # -----------------------------
-def read_first_two_columns(file_path, sheet_name='Sheet1'):
+def _read_columns_calamine(file_path, sheet_name):
+    """Read columns A:B (header row skipped) with the Rust calamine parser."""
+    sheet = CalamineWorkbook.from_path(file_path).get_sheet_by_name(sheet_name)
+    # Stream the rows instead of building the whole sheet as a list of lists
+    # first. iter_rows() starts at row 1 but at the first used column, so
+    # shift the A/B positions by that column's offset.
+    first_col = sheet.start[1] if sheet.start else 0
+    ia, ib = -first_col, 1 - first_col
+    rows = sheet.iter_rows()
+    next(rows, None)  # header row
+    column1_list = []
+    column2_values = array('d')
+    for row in rows:
+        a = row[ia] if 0 <= ia < len(row) else ''
+        b = row[ib] if 0 <= ib < len(row) else ''
+        column1_list.append(np.nan if a == '' else a)
+        column2_values.append(np.nan if b == '' else float(b))
+    return column1_list, column2_values
+
+
+def _normalize_cell(value):
+    """
+    Map a column-A cell to the same Python type whichever reader parsed it:
+    calamine returns whole numbers as float and midnight timestamps as
+    `date`, openpyxl returns `int` and `datetime`. Like pandas, use the latter.
+    """
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def _read_columns_openpyxl(file_path, sheet_name):
+    """Stream columns A:B (header row skipped) with openpyxl in read-only mode."""
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet_name].iter_rows(min_col=1, max_col=2, values_only=True)
+        next(rows, None)  # header row
+        column1_list = []
+        column2_values = array('d')
+        for a, b in rows:
+            column1_list.append(np.nan if a is None else a)
+            column2_values.append(np.nan if b is None else float(b))
+    finally:
+        wb.close()
+    return column1_list, column2_values
+
+
+def _parquet_cache_path(file_path, sheet_name):
+    """Location of the Parquet cache for one sheet, next to the Excel file."""
+    root, _ = os.path.splitext(file_path)
+    return f"{root}.{sheet_name}.parquet"
+
+
+def read_first_two_columns(file_path, sheet_name='Sheet1', dtype=np.float64, use_cache=False):
     """
     Read the first two columns from an Excel file.
 
+    The sheet is parsed with python-calamine when it is installed (much faster
+    on large sheets) and with openpyxl in read-only mode otherwise. In both
+    cases the first row is treated as the header and empty cells become NaN.
+
+    With `use_cache`, the parsed columns are also saved as
+    '<file>.<sheet>.parquet' next to the Excel file, and later calls read that
+    instead as long as it is newer than the workbook. Only sheets whose column
+    A is numeric or datetime are cached, since those round-trip through
+    Parquet unchanged; mixed or text columns are parsed every time. Caching
+    needs pyarrow (or fastparquet); without it, or if the cache cannot be
+    written, the sheet is simply parsed every time.
+
     Parameters
     ----------
     file_path : str
         Path to the Excel (.xlsx) file.
     sheet_name : str, optional
         Worksheet name to read (default: 'Sheet1').
+    dtype : np.dtype, optional
+        Floating-point type for column B (default: np.float64). Pass np.float32
+        to halve the bytes the sliding-window scans read; frequencies of ~500 Hz
+        still keep a resolution of ~3e-5 Hz, far below the sensor sensitivity.
+    use_cache : bool, optional
+        Read/write the Parquet cache described above (default: False).
 
     Returns
     -------
-    column1_list : list
+    column1 : np.ndarray
         Values from column A (could be time/index).
-    column2_list : list
-        Values from column B (frequency readings).
-    """
-    data = pd.read_excel(
-        file_path,
-        sheet_name=sheet_name,
-        engine='openpyxl',
-        usecols="A:B"
-    )
-    column1_list = data.iloc[:, 0].tolist()
-    column2_list = data.iloc[:, 1].tolist()
-    return column1_list, column2_list
+    column2 : np.ndarray
+        Values from column B (frequency readings) as a contiguous `dtype` array.
+    """
+    cache_path = _parquet_cache_path(file_path, sheet_name)
+    if (use_cache and os.path.exists(cache_path)
+            and os.path.getmtime(cache_path) >= os.path.getmtime(file_path)):
+        try:
+            data = pd.read_parquet(cache_path)
+            column1 = data["column1"].to_numpy()
+            if column1.dtype.kind in "biufM":
+                return column1, data["column2"].to_numpy(dtype=dtype)
+        except (ImportError, OSError, ValueError):
+            pass  # unreadable cache: parse the sheet again
+
+    # Column B is converted to float64 while reading (no per-cell objects are
+    # kept and no dtype inference is needed); column A cells are normalized
+    # to reader-independent types below.
+    if CalamineWorkbook is not None:
+        column1_list, column2_values = _read_columns_calamine(file_path, sheet_name)
+    else:
+        column1_list, column2_values = _read_columns_openpyxl(file_path, sheet_name)
+
+    # Drop trailing empty rows (formatted but blank cells), as pandas does
+    n = len(column1_list)
+    while n > 0 and pd.isna(column1_list[n - 1]) and np.isnan(column2_values[n - 1]):
+        n -= 1
+    # Infer the dtype like pandas: mixed cells stay as-is in an object array
+    column1 = pd.Series([_normalize_cell(a) for a in column1_list[:n]], dtype=object).infer_objects().to_numpy()
+    column2 = np.frombuffer(column2_values, dtype=np.float64)[:n]
+
+    if use_cache and column1.dtype.kind in "biufM":
+        try:
+            pd.DataFrame({"column1": column1, "column2": column2}).to_parquet(cache_path, index=False)
+        except (ImportError, OSError, TypeError, ValueError):
+            pass  # caching is best-effort
+    return column1, column2.astype(dtype, copy=False)
+
+
+def _as_float_array(values):
+    """Contiguous float array; float32 input is kept, anything else becomes float64."""
+    values = np.ascontiguousarray(values)
+    if values.dtype != np.float32:
+        values = values.astype(np.float64, copy=False)
+    return values
 
 
 # -----------------------------
 # Temperature compensation
 # -----------------------------
+def temperature_correction(temp_celsius=37.0, ref_temp=37.0, temp_coeff_per_deg=0.1):
+    """
+    Frequency offset that normalizes a reading taken at `temp_celsius` to `ref_temp`.
+
+    This is the scalar `(ref_temp - temp_celsius) * temp_coeff_per_deg` used by
+    `apply_temperature_compensation`. Pass it as `correction=` to
+    `build_adaptive_series` to apply the compensation on the fly, without
+    materializing a compensated copy of the data.
+
+    Returns
+    -------
+    float
+        Correction to add to every measured frequency.
+    """
+    return (ref_temp - temp_celsius) * temp_coeff_per_deg
+
+
 def apply_temperature_compensation(freq_values, temp_celsius=37.0, ref_temp=37.0, temp_coeff_per_deg=0.1):
     """
     Normalize measured frequencies to the reference temperature (default: 37 °C).
@@ -70,13 +215,161 @@ def apply_temperature_compensation(freq_values, temp_celsius=37.0, ref_temp=37.0
         Temperature-compensated frequency array.
     """
     freq_values = np.asarray(freq_values, dtype=float)
-    correction = (ref_temp - temp_celsius) * temp_coeff_per_deg
+    correction = temperature_correction(temp_celsius, ref_temp, temp_coeff_per_deg)
     return freq_values + correction
 
 
+# -----------------------------
+# Fixed sliding-window: average of the smallest bottom_n values
+# -----------------------------
+@njit(cache=True)
+def _insert_smallest(vals, idxs, count, x, j):
+    """
+    Insert value `x` (sample index `j`) into the ascending list vals[:count],
+    keeping at most len(vals) entries. Returns the new count.
+    """
+    k = vals.shape[0]
+    if count == k:
+        if not x < vals[k - 1]:
+            return count
+        pos = k - 1
+    else:
+        pos = count
+        count += 1
+    while pos > 0 and vals[pos - 1] > x:
+        vals[pos] = vals[pos - 1]
+        idxs[pos] = idxs[pos - 1]
+        pos -= 1
+    vals[pos] = x
+    idxs[pos] = j
+    return count
+
+
+@njit(parallel=True, cache=True)
+def _rolling_min_average_kernel(values, window, bottom_n, capacity, correction, block_size, out):
+    """
+    Rolling k-smallest scan behind `rolling_min_average`, on `values + correction`.
+
+    The `capacity` smallest values of the current window (at least
+    `bottom_n`) are kept sorted together with their sample indices. Sliding
+    by one sample drops the outgoing sample if it is tracked and inserts the
+    incoming one if it is below the largest tracked value, both in
+    O(capacity). Only when fewer than `bottom_n` values remain tracked is the
+    window rescanned, in O(window). On noisy data this is rare. On a steadily
+    rising signal, where every outgoing sample is a minimum, it happens once
+    every `capacity - bottom_n + 1` slides. Blocks of `block_size` start
+    indices are independent and processed in parallel.
+    """
+    n_out = out.shape[0]
+    n_blocks = (n_out + block_size - 1) // block_size
+    for b in prange(n_blocks):
+        first = b * block_size
+        last = min(first + block_size, n_out)
+        vals = np.empty(capacity, dtype=np.float64)
+        idxs = np.empty(capacity, dtype=np.int64)
+        count = 0
+        for j in range(first, first + window):
+            count = _insert_smallest(vals, idxs, count, values[j] + correction, j)
+
+        for i in range(first, last):
+            if i > first:
+                # vals[:count] holds the `count` smallest values of the window
+                for m in range(count):
+                    if idxs[m] == i - 1:
+                        for r in range(m, count - 1):
+                            vals[r] = vals[r + 1]
+                            idxs[r] = idxs[r + 1]
+                        count -= 1
+                        break
+                # Every untracked sample is >= vals[count - 1], so the new one
+                # only joins if it is smaller than that
+                j = i + window - 1
+                x = values[j] + correction
+                if count > 0 and x < vals[count - 1]:
+                    count = _insert_smallest(vals, idxs, count, x, j)
+                if count < bottom_n:
+                    count = 0
+                    for j in range(i, i + window):
+                        count = _insert_smallest(vals, idxs, count, values[j] + correction, j)
+
+            total = 0.0
+            for m in range(bottom_n):
+                total += vals[m]
+            out[i] = total / bottom_n
+
+
+def rolling_min_average(values, window=300, bottom_n=3, chunk_size=4096, correction=0.0):
+    """
+    Compute the average of the smallest `bottom_n` values for every full window
+    of fixed length `window`, in one pass over the data.
+
+    If numba is installed, a rolling k-smallest structure is maintained while
+    the window slides (see `_rolling_min_average_kernel`). Otherwise the
+    windows are exposed as a strided 2D view and partitioned row-wise with
+    `np.partition`, `chunk_size` rows at a time so the temporary copy stays
+    small. Series containing NaN always take the NumPy path.
+
+    Parameters
+    ----------
+    values : array-like
+        1D array of (temperature-compensated) frequency values. float32 input
+        is processed as is; the averages are accumulated in float64.
+    window : int
+        Window length (default: 300).
+    bottom_n : int
+        Number of smallest values to average (default: 3).
+    chunk_size : int
+        Number of windows processed per block (default: 4096).
+    correction : float
+        Constant added to every value before windowing (default: 0.0).
+
+    Returns
+    -------
+    np.ndarray
+        One average per start index 0 .. N - window (empty if N < window).
+    """
+    if not 1 <= bottom_n <= window:
+        raise ValueError("bottom_n must be between 1 and window")
+
+    values = _as_float_array(values)
+    n_windows = len(values) - window + 1
+    if n_windows <= 0:
+        return np.empty(0, dtype=float)
+
+    out = np.empty(n_windows, dtype=float)
+    if HAVE_NUMBA and not np.isnan(values).any():
+        # Track a few spare minima so an expiring one rarely forces a rescan
+        capacity = min(int(window), 2 * int(bottom_n) + 16)
+        _rolling_min_average_kernel(values, int(window), int(bottom_n), capacity,
+                                    float(correction), int(chunk_size), out)
+        return out
+
+    values = values.astype(np.float64, copy=False)
+    if correction != 0.0:
+        values = values + correction
+    windows = np.lib.stride_tricks.sliding_window_view(values, window)
+    for start in range(0, n_windows, chunk_size):
+        stop = min(start + chunk_size, n_windows)
+        smallest = np.partition(windows[start:stop], bottom_n - 1, axis=1)[:, :bottom_n]
+        out[start:stop] = smallest.mean(axis=1)
+    return out
+
+
 # -----------------------------
 # Adaptive sliding-window: average of the smallest bottom_n values
 # -----------------------------
+@njit(cache=True)
+def _percentile_rank(window_len, low_percentile):
+    """
+    Index of the lower of the two sorted values np.percentile ('linear')
+    interpolates between for a window of `window_len` points.
+
+    If this is >= bottom_n - 1 the threshold is at or above the bottom_n-th
+    smallest value, so at least bottom_n points always count as 'very low'.
+    """
+    return int(np.floor((window_len - 1) * (low_percentile / 100.0)))
+
+
 def adaptive_min_average(values,
                          start_index,
                          base_window=300,
@@ -138,9 +431,14 @@ def adaptive_min_average(values,
             return None
 
         window = values[start_index:end]
-        # Determine how many 'very low' points we have in this window
-        thr = np.percentile(window, low_percentile)
-        count_very_low = np.count_nonzero(window <= thr)
+        if _percentile_rank(len(window), low_percentile) >= bottom_n - 1 and not np.isnan(window).any():
+            # The percentile cannot fall below the bottom_n-th smallest value;
+            # skip the threshold and go straight to the minima
+            count_very_low = bottom_n
+        else:
+            # Determine how many 'very low' points we have in this window
+            thr = np.percentile(window, low_percentile)
+            count_very_low = np.count_nonzero(window <= thr)
 
         if count_very_low >= bottom_n:
             # We have enough low points; compute mean of the smallest `bottom_n`
@@ -153,7 +451,7 @@ def adaptive_min_average(values,
             new_window_len += 1  # ensure progress
 
         # Safety cap: do not exceed max_window nor the array end
-        if new_window_len > max_window and (start_index + window_len) >= n:
+        if new_window_len > max_window and ((start_index + window_len) >= n or window_len >= max_window):
             # No more meaningful expansion possible; fallback: use whatever we have
             smallest = np.partition(window, min(bottom_n, len(window)) - 1)[:min(bottom_n, len(window))]
             return float(np.mean(smallest)) if len(smallest) > 0 else None
@@ -165,20 +463,117 @@ def adaptive_min_average(values,
             return float(np.mean(smallest)) if len(smallest) > 0 else None
 
 
+@njit(cache=True)
+def _lerp(a, b, t):
+    """Linear interpolation between a and b, rounded exactly as np.percentile does."""
+    if t >= 0.5:
+        return b - (b - a) * (1.0 - t)
+    return a + (b - a) * t
+
+
+@njit(cache=True)
+def _has_enough_lows(smallest, window_len, bottom_n, low_percentile, has_nan):
+    """
+    Decide whether `count(window <= percentile(window, low_percentile)) >= bottom_n`
+    from the window's `bottom_n` smallest values (ascending) alone.
+
+    With sorted values s, the count reaches bottom_n exactly when the threshold
+    is >= s[bottom_n - 1]. np.percentile ('linear') interpolates between s[lo]
+    and s[lo + 1] with lo = floor((window_len - 1) * low_percentile / 100), so
+    the answer is always yes when lo >= bottom_n - 1; otherwise both s[lo] and
+    s[lo + 1] are among the bottom_n smallest and the threshold can be rebuilt
+    exactly. A NaN makes np.percentile return NaN, so nothing counts as low.
+    """
+    if has_nan or window_len < bottom_n:
+        return False
+    lo = _percentile_rank(window_len, low_percentile)
+    if lo >= bottom_n - 1:
+        return True
+    h = (window_len - 1) * (low_percentile / 100.0)
+    thr = _lerp(smallest[lo], smallest[lo + 1], h - lo)
+    return thr >= smallest[bottom_n - 1]
+
+
+@njit(parallel=True, cache=True)
+def _adaptive_series_kernel(values, base_window, bottom_n, low_percentile,
+                            growth_factor, max_window, correction, block_size, out):
+    """
+    Compiled equivalent of calling `adaptive_min_average` for every start index
+    0 .. len(out) - 1 on `values + correction`. The correction is added as the
+    samples are read.
+
+    Instead of computing the percentile threshold and counting the points below
+    it, the stop condition is derived from the smallest values of the window
+    (see `_has_enough_lows`). Those are collected with one streaming pass into
+    a small scratch list, so no window is ever copied. Start indices are
+    processed in blocks of `block_size`: blocks run in parallel, and each block
+    reuses its scratch list and the overlapping part of `values` it just read.
+    """
+    n = values.shape[0]
+    n_out = out.shape[0]
+    n_blocks = (n_out + block_size - 1) // block_size
+    for b in prange(n_blocks):
+        smallest = np.empty(bottom_n, dtype=np.float64)
+        idxs = np.empty(bottom_n, dtype=np.int64)
+        for i in range(b * block_size, min((b + 1) * block_size, n_out)):
+            window_len = base_window
+            while True:
+                end = min(n, i + window_len)
+                has_nan = False
+                count = 0
+                for j in range(i, end):
+                    v = values[j] + correction
+                    if np.isnan(v):
+                        has_nan = True
+                    else:
+                        count = _insert_smallest(smallest, idxs, count, v, j)
+                # np.partition orders NaN last, so they only fill missing slots
+                k = min(bottom_n, end - i)
+                for m in range(count, k):
+                    smallest[m] = np.nan
+
+                done = _has_enough_lows(smallest, end - i, bottom_n,
+                                        low_percentile, has_nan)
+                if not done:
+                    new_window_len = int(np.ceil(window_len * growth_factor))
+                    if new_window_len == window_len:
+                        new_window_len += 1
+                    if i + window_len >= n or window_len >= max_window:
+                        # No more meaningful expansion possible; use whatever we have
+                        done = True
+                    else:
+                        window_len = min(new_window_len, max_window)
+
+                if done:
+                    total = 0.0
+                    for m in range(k):
+                        total += smallest[m]
+                    out[i] = total / k
+                    break
+
+
 def build_adaptive_series(values,
                           base_window=300,
                           bottom_n=3,
                           low_percentile=5.0,
                           growth_factor=1.5,
-                          max_window=None):
+                          max_window=None,
+                          correction=0.0):
     """
     Generate a series of local-minimum representatives using adaptive windows
     evaluated at every valid start index.
 
+    When `low_percentile` is high enough that a full `base_window` always
+    contains `bottom_n` 'very low' points, no window can grow and the series is
+    computed by `rolling_min_average`. Otherwise, if numba is installed, the
+    whole scan runs in a single compiled, parallel kernel; without numba
+    `adaptive_min_average` is called per start index.
+
     Parameters
     ----------
     values : array-like
-        Frequency data (already temperature-compensated).
+        Frequency data (temperature-compensated, or see `correction`). float32
+        input is processed as is; the averages are accumulated in float64.
     base_window : int
         Initial window size.
     bottom_n : int
@@ -189,18 +584,49 @@ def build_adaptive_series(values,
         Window growth multiplier when low points are insufficient.
     max_window : int or None
         Maximum window size.
+    correction : float
+        Constant added to every value before windowing, e.g. the result of
+        `temperature_correction` (default: 0.0, data already compensated).
 
     Returns
     -------
-    list of float
+    np.ndarray
         Sequence of local-minimum averages (one per start index where computed).
     """
-    values = np.asarray(values, dtype=float)
-    out = []
+    if base_window < 1 or bottom_n < 1:
+        raise ValueError("base_window and bottom_n must be positive")
+    if max_window is None:
+        max_window = int(4 * base_window)
+
+    values = _as_float_array(values)
     # We mimic your original behavior of scanning from 0 to N - base_window.
     # With adaptation, some windows may become larger than base_window.
     n = len(values)
+    if n == 0:
+        return np.empty(0, dtype=float)
     last_valid_start = max(0, n - base_window)  # maintain at least one full base window as in original code
+
+    # With the usual parameters (e.g. 5th percentile of 300 points vs. bottom 3)
+    # every full window already has enough low points: no window ever grows and
+    # the series is a plain fixed-window rolling minimum average.
+    if (n >= base_window
+            and _percentile_rank(base_window, low_percentile) >= bottom_n - 1
+            and not np.isnan(values).any()):
+        return rolling_min_average(values, window=base_window, bottom_n=bottom_n,
+                                   correction=correction)
+
+    if HAVE_NUMBA:
+        out = np.empty(last_valid_start + 1, dtype=float)
+        _adaptive_series_kernel(values, int(base_window), int(bottom_n),
+                                float(low_percentile), float(growth_factor),
+                                int(max_window), float(correction),
+                                128, out)  # 128 start indices per block
+        return out
+
+    values = values.astype(np.float64, copy=False)
+    if correction != 0.0:
+        values = values + correction
+    out = []
     for i in range(last_valid_start + 1):
         avg_min = adaptive_min_average(values, i,
                                        base_window=base_window,
@@ -210,7 +636,7 @@ def build_adaptive_series(values,
                                        max_window=max_window)
         if avg_min is not None:
             out.append(avg_min)
-    return out
+    return np.asarray(out, dtype=float)
 
 
 # -----------------------------
@@ -285,6 +711,96 @@ def calibrate_frequency_to_pressure(freq, segments):
     return np.nan
 
 
+class CalibrationTable:
+    """
+    Calibration segments in struct-of-arrays form for vectorized conversion.
+
+    The list of segment dicts is flattened once into three contiguous float64
+    arrays, so converting a series never touches the dicts again.
+
+    Parameters
+    ----------
+    segments : list of dict
+        Calibration segments as returned by `get_default_calibration_segments`,
+        covering a contiguous frequency range.
+
+    Attributes
+    ----------
+    f_low : np.ndarray
+        Lower frequency edge of each segment (ascending).
+    p_low : np.ndarray
+        Pressure at each lower edge.
+    slopes : np.ndarray
+        Pressure change per Hz within each segment.
+    """
+    __slots__ = ("f_low", "p_low", "slopes")
+
+    def __init__(self, segments):
+        segments = sorted(segments, key=lambda d: d["f_low"])
+        self.f_low = np.array([seg["f_low"] for seg in segments], dtype=float)
+        self.p_low = np.array([seg["p_at_low"] for seg in segments], dtype=float)
+        f_high = np.array([seg["f_high"] for seg in segments], dtype=float)
+        p_high = np.array([seg["p_at_high"] for seg in segments], dtype=float)
+        # Zero-width segments get slope 0 (pressure p_at_low), as in the scalar version
+        self.slopes = np.divide(p_high - self.p_low, f_high - self.f_low,
+                                out=np.zeros_like(f_high), where=f_high != self.f_low)
+
+
+@njit(parallel=True, cache=True)
+def _calibrate_kernel(freqs, f_low, p_low, slopes, out):
+    """
+    Compiled single pass of `calibrate_frequencies`. With only a handful of
+    segments, a branch-free linear scan of the edges beats a binary search,
+    and the multiply-add is fused into the same loop.
+    """
+    n_seg = f_low.shape[0]
+    for i in prange(freqs.shape[0]):
+        x = freqs[i]
+        k = 0
+        for s in range(1, n_seg):
+            k = s if x >= f_low[s] else k
+        out[i] = p_low[k] + (x - f_low[k]) * slopes[k]
+
+
+def calibrate_frequencies(freqs, calibration):
+    """
+    Vectorized version of `calibrate_frequency_to_pressure` for a whole array.
+
+    Every frequency is located among the segments' lower edges (a compiled
+    scan if numba is installed, otherwise a single `np.searchsorted`) and
+    converted with one multiply-add. Frequencies outside the calibrated range
+    are extrapolated with the slope of the nearest end segment, exactly as in
+    the scalar version.
+
+    Parameters
+    ----------
+    freqs : array-like
+        Frequency values (already temperature-compensated).
+    calibration : CalibrationTable or list of dict
+        Calibration table, or the segments to build one from. Build the table
+        once when converting several series.
+
+    Returns
+    -------
+    np.ndarray
+        Interpolated pressures, one per input frequency.
+    """
+    if not isinstance(calibration, CalibrationTable):
+        calibration = CalibrationTable(calibration)
+    freqs = np.asarray(freqs, dtype=float)
+
+    if HAVE_NUMBA:
+        flat = np.ascontiguousarray(freqs).reshape(-1)
+        out = np.empty_like(flat)
+        _calibrate_kernel(flat, calibration.f_low, calibration.p_low,
+                          calibration.slopes, out)
+        return out.reshape(freqs.shape)
+
+    idx = np.clip(np.searchsorted(calibration.f_low, freqs, side='right') - 1,
+                  0, len(calibration.f_low) - 1)
+    return calibration.p_low[idx] + (freqs - calibration.f_low[idx]) * calibration.slopes[idx]
+
+
 def get_default_calibration_segments():
     """
     Default piecewise calibration segments derived from your original if-elif mapping.
@@ -329,18 +845,18 @@ def get_default_calibration_segments():
 # -----------------------------
 # MAIN (example usage)
 # -----------------------------
-if __name__ == "__main__":
+def main():
     # ---- 1) Load data
     file_path = "D:/zhenshi.xlsx"
     sheet_name = "Sheet1"
-    column1, column2 = read_first_two_columns(file_path, sheet_name=sheet_name)
+    column1, column2 = read_first_two_columns(file_path, sheet_name=sheet_name, use_cache=True)
 
     # ---- 2) Temperature compensation (edit 'temp_celsius' as needed)
     # Enter the actual measurement temperature here:
     temp_celsius = 37.0   # <-- USER INPUT: set your measurement temperature (°C)
-    # If your sign convention is opposite, flip the sign in apply_temperature_compensation().
-    freq_tc = apply_temperature_compensation(
-        column2,
+    # If your sign convention is opposite, flip the sign in temperature_correction().
+    # The correction is applied inside build_adaptive_series (no compensated copy).
+    correction = temperature_correction(
         temp_celsius=temp_celsius,
         ref_temp=37.0,
         temp_coeff_per_deg=0.1  # <-- USER EDITABLE: frequency correction per 1 °C
@@ -348,25 +864,29 @@ if __name__ == "__main__":
 
     # ---- 3) Build adaptive minima series
     adaptive_series = build_adaptive_series(
-        freq_tc,
+        column2,
         base_window=300,    # <-- USER EDITABLE: starting window (samples)
         bottom_n=3,         # <-- USER EDITABLE: how many minima to average
         low_percentile=5.0, # <-- USER EDITABLE: 'very low' definition (percentile)
         growth_factor=1.5,  # <-- USER EDITABLE: how aggressively to expand window
-        max_window=None     # <-- USER EDITABLE: cap; None defaults to 4x base_window
+        max_window=None,    # <-- USER EDITABLE: cap; None defaults to 4x base_window
+        correction=correction
     )
 
     # ---- 4) Frequency → Pressure conversion via piecewise linear interpolation
     # >>> VERY IMPORTANT: Update these breakpoints & pressures after your STANDARD CALIBRATION procedure. <<<
-    calib_segments = get_default_calibration_segments()
+    calib_table = CalibrationTable(get_default_calibration_segments())
 
-    pressures = [calibrate_frequency_to_pressure(f, calib_segments) for f in adaptive_series]
+    pressures = calibrate_frequencies(adaptive_series, calib_table)
 
-    # ---- 5) Output (simple print; replace with CSV export if desired)
-    for p in pressures:
-        print(p)
+    # ---- 5) Output (one buffered write; replace with CSV export if desired)
+    np.savetxt(sys.stdout, pressures, fmt='%.6f')
 
     # OPTIONAL: save to CSV for downstream analysis
     # out_df = pd.DataFrame({"pressure": pressures})
-    # out_df.to_csv("pressure_results.csv", index=False)
+    # out_df.to_csv("pressure_results.csv", index=False, float_format='%.6f')
     # print("Saved:", "pressure_results.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+import Frequency2IOP as F
+
+
+def _series(n=600, seed=0, ties=False, nan=False, dtype=np.float64):
+    rng = np.random.default_rng(seed)
+    values = 495 + 6 * np.sin(np.arange(n) / 80.0) + rng.normal(0, 0.8, n)
+    if ties:
+        values = np.round(values * 2) / 2
+    if nan:
+        values[rng.choice(n, 3, replace=False)] = np.nan
+    return values.astype(dtype)
+
+
+def _per_index(values, **kwargs):
+    """build_adaptive_series computed one start index at a time."""
+    values = np.asarray(values, dtype=np.float64)
+    base_window = kwargs.get("base_window", 300)
+    last_valid_start = max(0, len(values) - base_window)
+    return np.array([F.adaptive_min_average(values, i, **kwargs)
+                     for i in range(last_valid_start + 1)])
+
+
+# Parameters for which the percentile stop test decides whether windows grow
+@pytest.mark.parametrize("kwargs", [
+    dict(base_window=100, bottom_n=3, low_percentile=0.5, max_window=1000),
+    dict(base_window=300, bottom_n=3, low_percentile=0.1),
+    dict(base_window=40, bottom_n=5, low_percentile=7.0),
+    dict(base_window=50, bottom_n=10, low_percentile=5.0),
+    dict(base_window=2, bottom_n=3, low_percentile=50.0),
+])
+@pytest.mark.parametrize("ties", [False, True])
+@pytest.mark.parametrize("nan", [False, True])
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_adaptive_series_matches_per_index(kwargs, ties, nan, dtype):
+    values = _series(ties=ties, nan=nan, dtype=dtype)
+    expected = _per_index(values, **kwargs)
+    result = F.build_adaptive_series(values, **kwargs)
+    np.testing.assert_allclose(result, expected, rtol=0, atol=1e-9)
+
+
+def _base_window_reference(values, base_window, bottom_n, low_percentile):
+    """Smallest-`bottom_n` mean per base window, using raw np.percentile."""
+    values = np.asarray(values, dtype=np.float64)
+    out = []
+    for i in range(max(0, len(values) - base_window) + 1):
+        window = values[i:i + base_window]
+        thr = np.percentile(window, low_percentile)
+        # These parameters never need a larger window
+        assert np.count_nonzero(window <= thr) >= bottom_n
+        out.append(np.mean(np.partition(window, bottom_n - 1)[:bottom_n]))
+    return np.array(out)
+
+
+# Parameters for which the fixed-window rolling_min_average fast path is taken
+@pytest.mark.parametrize("kwargs", [
+    dict(),
+    dict(base_window=100, bottom_n=3, low_percentile=5.0),
+    dict(base_window=40, bottom_n=2, low_percentile=3.0),
+    dict(base_window=60, bottom_n=6, low_percentile=10.0),
+    dict(base_window=5, bottom_n=5, low_percentile=100.0),
+])
+@pytest.mark.parametrize("ties", [False, True])
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+@pytest.mark.parametrize("correction", [0.0, -1.25])
+def test_adaptive_series_fast_path_matches_percentile_test(kwargs, ties, dtype, correction):
+    values = _series(ties=ties, dtype=dtype)
+    params = dict(dict(base_window=300, bottom_n=3, low_percentile=5.0), **kwargs)
+    expected = _base_window_reference(values.astype(np.float64) + correction, **params)
+    result = F.build_adaptive_series(values, correction=correction, **kwargs)
+    np.testing.assert_allclose(result, expected, rtol=0, atol=1e-9)
+
+
+# Rows of the sheet, header first; None leaves a cell empty
+@pytest.mark.parametrize("rows", [
+    [[None, "f"], [None, 495.1], [None, 496.0]],
+    [[None, "f", "x"], [None, 495.1, 1.0], [None, 496.0, 2.0]],
+    [[None, None, "x"], [None, None, 1.0], [None, None, 2.0]],
+    [["t", "f", None], [1, 495.1, None], [None, None, 3.0], [2, None, None]],
+])
+def test_readers_agree_on_sparse_sheets(tmp_path, monkeypatch, rows):
+    if F.CalamineWorkbook is None:
+        pytest.skip("python-calamine not installed")
+    openpyxl = pytest.importorskip("openpyxl")
+    path = str(tmp_path / "data.xlsx")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+    for r, row in enumerate(rows, start=1):
+        for c, value in enumerate(row, start=1):
+            if value is not None:
+                ws.cell(r, c, value)
+    wb.save(path)
+
+    result = F.read_first_two_columns(path)
+    monkeypatch.setattr(F, "CalamineWorkbook", None)
+    expected = F.read_first_two_columns(path)
+    for a, b in zip(result, expected):
+        assert a.dtype == b.dtype
+        np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize("calamine", [False, True])
+def test_parquet_cache_round_trip(tmp_path, monkeypatch, calamine):
+    pytest.importorskip("pyarrow")
+    if calamine and F.CalamineWorkbook is None:
+        pytest.skip("python-calamine not installed")
+    if not calamine:
+        monkeypatch.setattr(F, "CalamineWorkbook", None)
+    openpyxl = pytest.importorskip("openpyxl")
+    path = str(tmp_path / "data.xlsx")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+    ws.append(["time", "freq"])
+    ws.append([date(2024, 1, 2), 495.25])
+    ws.append([datetime(2024, 1, 2, 0, 0, 0, 500000), None])
+    ws.append([datetime(2024, 1, 2, 13, 5, 1), 496.5])
+    wb.save(path)
+
+    expected = F.read_first_two_columns(path)
+    F.read_first_two_columns(path, use_cache=True)
+    assert (tmp_path / "data.Sheet1.parquet").exists()
+    cached = F.read_first_two_columns(path, use_cache=True)
+    for a, b in zip(expected, cached):
+        assert a.dtype == b.dtype
+        np.testing.assert_array_equal(a, b)
+
+
+# Default segments, and the same with a zero-width segment clamping above 570 Hz
+@pytest.mark.parametrize("degenerate", [False, True])
+@pytest.mark.parametrize("numba", [True, False])
+def test_calibrate_frequencies_matches_scalar(monkeypatch, degenerate, numba):
+    if numba and not F.HAVE_NUMBA:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(F, "HAVE_NUMBA", numba)
+    segments = F.get_default_calibration_segments()
+    if degenerate:
+        segments = segments + [{"f_low": 570.0, "f_high": 570.0, "p_at_low": 0.0, "p_at_high": 0.0}]
+    # In-range values, both extrapolation sides, the exact edges and NaN
+    freqs = np.concatenate([np.linspace(350.0, 620.0, 541),
+                            [400.0, 484.8, 487.8, 505.0, 570.0, np.nan]])
+    expected = np.array([F.calibrate_frequency_to_pressure(f, segments) for f in freqs])
+    for calibration in (segments, F.CalibrationTable(segments)):
+        result = F.calibrate_frequencies(freqs, calibration)
+        np.testing.assert_allclose(result, expected, rtol=0, atol=1e-9)
+    if degenerate:
+        assert np.all(F.calibrate_frequencies(freqs[freqs >= 570.0], segments) == 0.0)